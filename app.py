@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-import os
 from dotenv import load_dotenv
-from youtube_client import YouTubeClient
+from youtube_client import YouTubeClient, QuotaExhaustedError, load_api_keys
 from search_history import SearchHistoryManager
 
 # Load environment variables
@@ -51,9 +50,8 @@ st.markdown("""
 
 # Initialize YouTube client
 def get_youtube_client():
-    api_key = os.getenv("YOUTUBE_API_KEY") or st.secrets.get("YOUTUBE_API_KEY")
-    if not api_key:
-        st.error("YouTube API key not found. Please set YOUTUBE_API_KEY in your .env file or Streamlit secrets.")
+    if not load_api_keys():
+        st.error("YouTube API key not found. Please set YOUTUBE_API_KEYS or YOUTUBE_API_KEY in your .env file or Streamlit secrets.")
         return None
     return YouTubeClient()
 
@@ -155,6 +153,8 @@ if st.button("Search", key="search_button"):
             # Rerun to refresh the page
             st.rerun()
             
+        except QuotaExhaustedError:
+            st.error("Daily YouTube API quota is used up for all configured keys. Please try again after midnight Pacific Time.")
         except Exception as e:
             st.error(f"Error performing search: {str(e)}")
     else:
@@ -373,6 +373,8 @@ with st.sidebar:
                     # Rerun to refresh the page
                     st.rerun()
                     
+                except QuotaExhaustedError:
+                    st.error("Daily YouTube API quota is used up for all configured keys. Please try again after midnight Pacific Time.")
                 except Exception as e:
                     st.error(f"Error performing search: {str(e)}")
     else:
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import hashlib
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# YouTube Data API quota resets at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Default daily quota allocated to each API key
+DEFAULT_DAILY_LIMIT = 10000
+
+# Documented quota cost per API call
+QUOTA_COSTS = {
+    'search.list': 100,
+    'videos.list': 1,
+}
+
+
+def current_quota_day():
+    """Get the current quota day as an ISO date string."""
+    return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+
+class QuotaLedger:
+    """Tracks YouTube API quota usage per key in a local SQLite file.
+
+    The ledger is shared by every process that points at the same file, so
+    several app workers can draw from one pool of keys without overspending.
+    SQLite's file locking serialises the read-and-charge step across processes.
+    """
+
+    def __init__(self, file_path="data/quota_ledger.db", daily_limit=DEFAULT_DAILY_LIMIT):
+        """Initialize the quota ledger.
+
+        Args:
+            file_path (str): Path to the SQLite file for storing quota usage
+            daily_limit (int): Quota units available to each key per day
+        """
+        self.file_path = file_path
+        self.daily_limit = daily_limit
+        self._ensure_data_directory()
+        self._ensure_table_exists()
+
+    def _ensure_data_directory(self):
+        """Ensure the data directory exists."""
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connect(self):
+        """Open a connection that waits for other processes to release the lock."""
+        # isolation_level=None lets us issue BEGIN IMMEDIATE ourselves
+        return sqlite3.connect(self.file_path, timeout=30, isolation_level=None)
+
+    def _ensure_table_exists(self):
+        """Ensure the quota usage table exists."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota_usage ("
+                "key_id TEXT NOT NULL, "
+                "quota_day TEXT NOT NULL, "
+                "units INTEGER NOT NULL, "
+                "PRIMARY KEY (key_id, quota_day))"
+            )
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key_id(api_key):
+        """Fingerprint an API key so the raw key is never written to disk."""
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+    def _used_units(self, conn, api_keys, quota_day):
+        """Get units used today for each key, defaulting to 0."""
+        used = {}
+        for api_key in api_keys:
+            row = conn.execute(
+                "SELECT units FROM quota_usage WHERE key_id = ? AND quota_day = ?",
+                (self._key_id(api_key), quota_day)
+            ).fetchone()
+            used[api_key] = row[0] if row else 0
+        return used
+
+    def remaining(self, api_keys):
+        """Get the remaining quota for each key today.
+
+        Args:
+            api_keys (list): API keys to look up
+
+        Returns:
+            dict: Mapping of API key to remaining quota units
+        """
+        conn = self._connect()
+        try:
+            used = self._used_units(conn, api_keys, current_quota_day())
+        finally:
+            conn.close()
+        return {api_key: max(self.daily_limit - units, 0) for api_key, units in used.items()}
+
+    def reserve(self, api_keys, cost, exclude=(), quota_day=None):
+        """Charge a call to the key with the most remaining quota.
+
+        Args:
+            api_keys (list): API keys to choose from
+            cost (int): Quota units the call will consume
+            exclude (iterable): Keys that must not be chosen
+            quota_day (str): Quota day to charge; defaults to today
+
+        Returns:
+            str: The charged API key, or None if no key has enough quota left
+        """
+        quota_day = quota_day or current_quota_day()
+        candidates = [api_key for api_key in api_keys if api_key not in exclude]
+        conn = self._connect()
+        try:
+            # Take the write lock before reading so no other process can
+            # charge the same budget between our read and our update
+            conn.execute("BEGIN IMMEDIATE")
+            used = self._used_units(conn, candidates, quota_day)
+            best_key = None
+            best_remaining = cost - 1
+            for api_key in candidates:
+                remaining = self.daily_limit - used[api_key]
+                if remaining > best_remaining:
+                    best_key = api_key
+                    best_remaining = remaining
+            if best_key is not None:
+                conn.execute(
+                    "INSERT INTO quota_usage (key_id, quota_day, units) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key_id, quota_day) DO UPDATE SET units = units + excluded.units",
+                    (self._key_id(best_key), quota_day, cost)
+                )
+            conn.execute("COMMIT")
+            return best_key
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def mark_exhausted(self, api_key):
+        """Record that the API reported a key as out of quota for today.
+
+        Args:
+            api_key (str): The exhausted API key
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO quota_usage (key_id, quota_day, units) VALUES (?, ?, ?) "
+                "ON CONFLICT (key_id, quota_day) DO UPDATE SET units = MAX(units, excluded.units)",
+                (self._key_id(api_key), current_quota_day(), self.daily_limit)
+            )
+        finally:
+            conn.close()
+
+    def release(self, api_key, cost, quota_day=None):
+        """Refund a reservation for a call the API never billed.
+
+        Args:
+            api_key (str): The API key that was charged
+            cost (int): Quota units to give back
+            quota_day (str): Quota day the units were reserved on; defaults to today
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE quota_usage SET units = MAX(units - ?, 0) "
+                "WHERE key_id = ? AND quota_day = ?",
+                (cost, self._key_id(api_key), quota_day or current_quota_day())
+            )
+        finally:
+            conn.close()
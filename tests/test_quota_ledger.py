@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import quota_ledger
+from quota_ledger import QuotaLedger
+
+
+def _reserve_many(file_path, api_keys, cost, attempts):
+    """Reserve repeatedly from a fresh ledger, as a separate worker would."""
+    ledger = QuotaLedger(file_path, daily_limit=1000)
+    return [ledger.reserve(api_keys, cost) for _ in range(attempts)]
+
+
+def test_reserve_routes_to_key_with_most_remaining(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / "ledger.db"), daily_limit=1000)
+    ledger.reserve(["a"], 300)
+    ledger.reserve(["b"], 100)
+
+    assert ledger.reserve(["a", "b", "c"], 100) == "c"
+    assert ledger.reserve(["a", "b"], 100) == "b"
+    assert ledger.remaining(["a", "b", "c"]) == {"a": 700, "b": 800, "c": 900}
+
+
+def test_reserve_returns_none_when_every_key_is_below_cost(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / "ledger.db"), daily_limit=150)
+    assert ledger.reserve(["a", "b"], 100) == "a"
+    assert ledger.reserve(["a", "b"], 100) == "b"
+
+    assert ledger.reserve(["a", "b"], 100) is None
+    # Smaller calls still fit in what is left
+    assert ledger.reserve(["a", "b"], 1) == "a"
+
+
+def test_reserve_skips_excluded_keys(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / "ledger.db"), daily_limit=1000)
+    assert ledger.reserve(["a", "b"], 100, exclude={"a"}) == "b"
+    assert ledger.reserve(["a"], 100, exclude={"a"}) is None
+
+
+def test_mark_exhausted_and_release(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / "ledger.db"), daily_limit=1000)
+    ledger.reserve(["a"], 100)
+    ledger.release("a", 40)
+    assert ledger.remaining(["a"]) == {"a": 940}
+
+    # Refunds never push usage below zero
+    ledger.release("a", 500)
+    assert ledger.remaining(["a"]) == {"a": 1000}
+
+    ledger.mark_exhausted("a")
+    assert ledger.remaining(["a"]) == {"a": 0}
+    assert ledger.reserve(["a"], 1) is None
+
+
+def test_ledger_does_not_store_raw_keys(tmp_path):
+    file_path = tmp_path / "ledger.db"
+    ledger = QuotaLedger(str(file_path), daily_limit=1000)
+    ledger.reserve(["secret-api-key"], 100)
+
+    assert b"secret-api-key" not in file_path.read_bytes()
+
+
+def test_separate_connections_share_budget(tmp_path):
+    file_path = str(tmp_path / "ledger.db")
+    first = QuotaLedger(file_path, daily_limit=250)
+    second = QuotaLedger(file_path, daily_limit=250)
+
+    assert first.reserve(["a"], 100) == "a"
+    assert second.reserve(["a"], 100) == "a"
+    assert first.reserve(["a"], 100) is None
+    assert second.remaining(["a"]) == {"a": 50}
+
+
+def test_processes_sharing_a_ledger_cannot_overspend(tmp_path):
+    file_path = str(tmp_path / "ledger.db")
+    api_keys = ["a", "b", "c"]
+    QuotaLedger(file_path, daily_limit=1000)
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(_reserve_many, file_path, api_keys, 100, 20) for _ in range(4)]
+        reserved = [key for future in futures for key in future.result()]
+
+    # 3 keys x 1000 units allows exactly 30 calls of 100 units
+    assert sum(key is not None for key in reserved) == 30
+    assert QuotaLedger(file_path, daily_limit=1000).remaining(api_keys) == {"a": 0, "b": 0, "c": 0}
+
+
+def test_release_refunds_the_day_that_was_charged(tmp_path, monkeypatch):
+    ledger = QuotaLedger(str(tmp_path / "ledger.db"), daily_limit=1000)
+    monkeypatch.setattr(quota_ledger, "current_quota_day", lambda: "2026-10-17")
+    ledger.reserve(["a"], 100)
+
+    # The call fails after midnight Pacific and is refunded then
+    monkeypatch.setattr(quota_ledger, "current_quota_day", lambda: "2026-10-18")
+    ledger.reserve(["a"], 100)
+    ledger.release("a", 100, quota_day="2026-10-17")
+
+    assert ledger.remaining(["a"]) == {"a": 900}
+    monkeypatch.setattr(quota_ledger, "current_quota_day", lambda: "2026-10-17")
+    assert ledger.remaining(["a"]) == {"a": 1000}
@@ -0,0 +1,212 @@
+import json
+import socket
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import quota_ledger
+import youtube_client
+from quota_ledger import QuotaLedger
+from youtube_client import YouTubeClient, QuotaExhaustedError
+
+
+def make_http_error(status, reason, message=None):
+    """Build an HttpError shaped like the YouTube API's error responses."""
+    content = json.dumps({
+        'error': {
+            'code': status,
+            'message': message or reason,
+            'errors': [{'reason': reason, 'domain': 'youtube.quota'}],
+        }
+    }).encode('utf-8')
+    return HttpError(httplib2.Response({'status': status}), content)
+
+
+class FakeRequest:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+
+    def execute(self):
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+class FakeResource:
+    def __init__(self, service, name):
+        self.service = service
+        self.name = name
+
+    def list(self, **params):
+        self.service.calls.append((f"{self.name}.list", params))
+        return FakeRequest(self.service.responses.get(self.name, {'items': []}), self.service.error)
+
+
+class FakeService:
+    """Stands in for the object returned by googleapiclient's build()."""
+
+    def __init__(self, error=None, responses=None):
+        self.error = error
+        self.responses = responses or {}
+        self.calls = []
+
+    def search(self):
+        return FakeResource(self, 'search')
+
+    def videos(self):
+        return FakeResource(self, 'videos')
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return QuotaLedger(str(tmp_path / "ledger.db"), daily_limit=1000)
+
+
+def make_client(monkeypatch, ledger, services):
+    client = YouTubeClient(api_keys=list(services), ledger=ledger)
+    monkeypatch.setattr(client, '_get_service', services.__getitem__)
+    return client
+
+
+def test_quota_error_fails_over_to_next_key(monkeypatch, ledger):
+    services = {
+        'key-a': FakeService(error=make_http_error(403, 'quotaExceeded')),
+        'key-b': FakeService(),
+    }
+    client = make_client(monkeypatch, ledger, services)
+
+    assert client._execute('search.list', q='python') == {'items': []}
+    assert len(services['key-a'].calls) == 1
+    assert len(services['key-b'].calls) == 1
+    assert ledger.remaining(['key-a', 'key-b']) == {'key-a': 0, 'key-b': 900}
+
+
+def test_exhausted_key_is_skipped_by_later_calls(monkeypatch, ledger):
+    services = {
+        'key-a': FakeService(error=make_http_error(403, 'dailyLimitExceeded')),
+        'key-b': FakeService(),
+    }
+    client = make_client(monkeypatch, ledger, services)
+    client._execute('search.list', q='python')
+    client._execute('search.list', q='python')
+
+    assert len(services['key-a'].calls) == 1
+    assert len(services['key-b'].calls) == 2
+
+
+def test_raises_when_every_key_is_out_of_quota(monkeypatch, ledger):
+    services = {
+        'key-a': FakeService(error=make_http_error(403, 'quotaExceeded')),
+        'key-b': FakeService(error=make_http_error(403, 'quotaExceeded')),
+    }
+    client = make_client(monkeypatch, ledger, services)
+
+    with pytest.raises(QuotaExhaustedError):
+        client._execute('search.list', q='python')
+    assert ledger.remaining(['key-a', 'key-b']) == {'key-a': 0, 'key-b': 0}
+
+
+def test_calls_are_charged_their_documented_cost(monkeypatch, ledger):
+    client = make_client(monkeypatch, ledger, {'key-a': FakeService()})
+
+    client._execute('search.list', q='python')
+    assert ledger.remaining(['key-a']) == {'key-a': 900}
+
+    client._execute('videos.list', part='snippet', id='abc')
+    assert ledger.remaining(['key-a']) == {'key-a': 899}
+
+
+def test_search_videos_charges_search_and_video_lookups(monkeypatch, ledger):
+    service = FakeService(responses={'search': {'items': [{'id': {'videoId': 'abc'}}]}})
+    client = make_client(monkeypatch, ledger, {'key-a': service})
+
+    client.search_videos('python', english_only=False)
+
+    # One search.list plus two videos.list calls (tags and details)
+    assert [method for method, _ in service.calls] == ['search.list', 'videos.list', 'videos.list']
+    assert ledger.remaining(['key-a']) == {'key-a': 898}
+
+
+def test_search_videos_raises_when_quota_is_used_up(monkeypatch, ledger):
+    ledger.mark_exhausted('key-a')
+    client = make_client(monkeypatch, ledger, {'key-a': FakeService()})
+
+    with pytest.raises(QuotaExhaustedError):
+        client.search_videos('python')
+
+
+def test_quota_wording_in_message_is_not_a_quota_error(monkeypatch, ledger):
+    error = make_http_error(403, 'forbidden', message='Not allowed to read quotaExceeded reports')
+    services = {'key-a': FakeService(error=error), 'key-b': FakeService()}
+    client = make_client(monkeypatch, ledger, services)
+
+    with pytest.raises(HttpError):
+        client._execute('search.list', q='python')
+    assert services['key-b'].calls == []
+    assert ledger.remaining(['key-a']) == {'key-a': 900}
+
+
+def test_other_client_errors_keep_the_charge(monkeypatch, ledger):
+    services = {
+        'key-a': FakeService(error=make_http_error(400, 'badRequest')),
+        'key-b': FakeService(),
+    }
+    client = make_client(monkeypatch, ledger, services)
+
+    with pytest.raises(HttpError):
+        client._execute('search.list', q='python')
+    assert services['key-b'].calls == []
+    assert ledger.remaining(['key-a']) == {'key-a': 900}
+
+
+@pytest.mark.parametrize('error', [
+    ConnectionRefusedError('connection refused'),
+    httplib2.ServerNotFoundError('Unable to find the server'),
+])
+def test_failures_before_sending_are_refunded(monkeypatch, ledger, error):
+    client = make_client(monkeypatch, ledger, {'key-a': FakeService(error=error)})
+
+    with pytest.raises(type(error)):
+        client._execute('search.list', q='python')
+    assert ledger.remaining(['key-a']) == {'key-a': 1000}
+
+
+def test_service_build_failure_is_refunded(monkeypatch, ledger):
+    client = YouTubeClient(api_keys=['key-a'], ledger=ledger)
+
+    def failing_build(api_key):
+        raise RuntimeError('discovery document unavailable')
+
+    monkeypatch.setattr(client, '_get_service', failing_build)
+
+    with pytest.raises(RuntimeError):
+        client._execute('search.list', q='python')
+    assert ledger.remaining(['key-a']) == {'key-a': 1000}
+
+
+@pytest.mark.parametrize('error', [
+    make_http_error(503, 'backendError'),
+    socket.timeout('timed out'),
+    ConnectionResetError('connection reset'),
+])
+def test_failures_after_sending_keep_the_charge(monkeypatch, ledger, error):
+    client = make_client(monkeypatch, ledger, {'key-a': FakeService(error=error)})
+
+    with pytest.raises(type(error)):
+        client._execute('search.list', q='python')
+    assert ledger.remaining(['key-a']) == {'key-a': 900}
+
+
+def test_refund_after_midnight_goes_to_the_reserved_day(monkeypatch, ledger):
+    days = iter(['2026-10-17'])
+    monkeypatch.setattr(youtube_client, 'current_quota_day', lambda: next(days))
+    monkeypatch.setattr(quota_ledger, 'current_quota_day', lambda: '2026-10-18')
+    client = make_client(monkeypatch, ledger, {'key-a': FakeService(error=ConnectionRefusedError())})
+    # Usage already charged on the new day must not be refunded
+    ledger.reserve(['key-a'], 100)
+
+    with pytest.raises(ConnectionRefusedError):
+        client._execute('search.list', q='python')
+    assert ledger.remaining(['key-a']) == {'key-a': 900}
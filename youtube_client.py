@@ -1,4 +1,6 @@
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+import httplib2
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
@@ -7,19 +9,117 @@ import re
 from langdetect import detect, LangDetectException
 from collections import Counter
 import isodate
+from quota_ledger import QuotaLedger, QUOTA_COSTS, DEFAULT_DAILY_LIMIT, current_quota_day
 
 # Load environment variables
 load_dotenv()
 
+# Error reasons returned by the API when a key has run out of quota
+QUOTA_ERROR_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when every API key in the pool is out of quota."""
+
+
+def load_api_keys():
+    """Read the API key pool from environment variables or Streamlit secrets.
+
+    YOUTUBE_API_KEYS holds a comma-separated pool; YOUTUBE_API_KEY is still
+    accepted for single-key setups.
+    """
+    keys = os.getenv("YOUTUBE_API_KEYS") or os.getenv("YOUTUBE_API_KEY")
+    if not keys:
+        try:
+            keys = st.secrets.get("YOUTUBE_API_KEYS") or st.secrets.get("YOUTUBE_API_KEY")
+        except FileNotFoundError:
+            # No secrets.toml; environment variables are the only source
+            keys = None
+    if not keys:
+        return []
+    if isinstance(keys, str):
+        keys = keys.split(',')
+    # Drop blanks and duplicates while keeping the configured order
+    return list(dict.fromkeys(key.strip() for key in keys if key.strip()))
+
+
 class YouTubeClient:
-    def __init__(self):
-        """Initialize YouTube API client"""
-        # Try to get API key from environment variables or Streamlit secrets
-        self.api_key = os.getenv("YOUTUBE_API_KEY") or st.secrets.get("YOUTUBE_API_KEY")
-        if not self.api_key:
+    def __init__(self, api_keys=None, ledger=None):
+        """Initialize YouTube API client
+
+        Args:
+            api_keys (list): API keys to draw quota from; read from the
+                environment or Streamlit secrets when not given
+            ledger (QuotaLedger): Shared quota ledger; defaults to the one in data/
+        """
+        self.api_keys = list(api_keys) if api_keys else load_api_keys()
+        if not self.api_keys:
             raise ValueError("YouTube API key not found in environment variables or Streamlit secrets")
-        
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+
+        if ledger is None:
+            daily_limit = int(os.getenv("YOUTUBE_DAILY_QUOTA", DEFAULT_DAILY_LIMIT))
+            ledger = QuotaLedger(daily_limit=daily_limit)
+        self.ledger = ledger
+        self._services = {}
+
+    def _get_service(self, api_key):
+        """Get the API service for a key, building it on first use."""
+        if api_key not in self._services:
+            self._services[api_key] = build('youtube', 'v3', developerKey=api_key)
+        return self._services[api_key]
+
+    @staticmethod
+    def _is_quota_error(error):
+        """Check whether an HttpError means the key is out of quota."""
+        if error.resp.status != 403:
+            return False
+        # error_details holds the parsed error list, or the raw body when it is not JSON
+        details = error.error_details if isinstance(error.error_details, list) else []
+        return any(isinstance(detail, dict) and detail.get('reason') in QUOTA_ERROR_REASONS for detail in details)
+
+    def _execute(self, method, **params):
+        """Run an API call on the key with the most quota left, failing over on quota errors.
+
+        Args:
+            method (str): API method name such as 'search.list'
+            **params: Parameters passed to the API method
+
+        Returns:
+            dict: The API response
+        """
+        resource_name, method_name = method.split('.')
+        cost = QUOTA_COSTS[method]
+        tried = set()
+
+        while True:
+            # Pin the day so a refund after midnight comes off the day that was charged
+            quota_day = current_quota_day()
+            api_key = self.ledger.reserve(self.api_keys, cost, exclude=tried, quota_day=quota_day)
+            if api_key is None:
+                raise QuotaExhaustedError(f"No API key has {cost} quota units left for {method}")
+            tried.add(api_key)
+
+            try:
+                resource = getattr(self._get_service(api_key), resource_name)()
+                request = getattr(resource, method_name)(**params)
+            except Exception:
+                # Nothing was sent, so the API cannot have billed this call
+                self.ledger.release(api_key, cost, quota_day)
+                raise
+
+            try:
+                return request.execute()
+            except (ConnectionRefusedError, httplib2.ServerNotFoundError):
+                # The connection was never opened, so nothing was billed.
+                # Read timeouts, resets and 5xx responses may come after the
+                # API counted the call, so their charge is kept.
+                self.ledger.release(api_key, cost, quota_day)
+                raise
+            except HttpError as e:
+                if not self._is_quota_error(e):
+                    raise
+                # Record the exhaustion so other processes skip this key too
+                self.ledger.mark_exhausted(api_key)
 
     def _get_date_filter(self, date_range):
         """Convert date range selection to datetime object"""
@@ -70,10 +170,11 @@ class YouTubeClient:
             
             for i in range(0, len(video_ids), chunk_size):
                 chunk = video_ids[i:i + chunk_size]
-                response = self.youtube.videos().list(
+                response = self._execute(
+                    'videos.list',
                     part='snippet',
                     id=','.join(chunk)
-                ).execute()
+                )
                 
                 # Extract tags from each video
                 for item in response.get('items', []):
@@ -97,6 +198,9 @@ class YouTubeClient:
             # Sort English tags alphabetically
             return sorted(english_tags)
             
+        except QuotaExhaustedError:
+            # Let the caller tell the user the daily quota is used up
+            raise
         except Exception as e:
             print(f"Error fetching video tags: {str(e)}")
             return []
@@ -122,7 +226,7 @@ class YouTubeClient:
                 search_params['publishedAfter'] = date_range.isoformat() + 'Z'
             
             # Perform search
-            search_response = self.youtube.search().list(**search_params).execute()
+            search_response = self._execute('search.list', **search_params)
             
             # Extract video IDs for detailed info
             video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
@@ -131,10 +235,11 @@ class YouTubeClient:
             video_tags = self._get_video_tags(video_ids)
             
             # Get detailed video information
-            videos_response = self.youtube.videos().list(
+            videos_response = self._execute(
+                'videos.list',
                 part='snippet,contentDetails,statistics',
                 id=','.join(video_ids)
-            ).execute()
+            )
             
             # Process results
             results = []
@@ -207,6 +312,9 @@ class YouTubeClient:
             
             return results, video_tags
             
+        except QuotaExhaustedError:
+            # Let the caller tell the user the daily quota is used up
+            raise
         except Exception as e:
             print(f"Error performing search: {str(e)}")
             return [], [] 
\ No newline at end of file